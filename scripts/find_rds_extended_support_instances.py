@@ -3,112 +3,190 @@
 
 import os
 import sys
-import uuid
-import json
+import csv
 import boto3
 import argparse
-import threading 
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-''' Supress the following
-DeprecationWarning: 
-Pyarrow will become a required dependency of pandas in the next major release of pandas (pandas 3.0),
-(to allow more performant data types, such as the Arrow string type, and better interoperability with other libraries)
-but was not found to be installed on your system.
-If this would cause problems for you,
-please provide us feedback at https://github.com/pandas-dev/pandas/issues/54466
-'''
-import warnings
-warnings.filterwarnings("ignore", category=DeprecationWarning) 
-import pandas as pd
-
 from utils.utils import (
-    is_china_region, 
-    validate_if_being_run_by_payer_account, 
+    is_china_region,
+    validate_if_being_run_by_payer_account,
     validate_org_accounts,
     get_all_org_accounts,
     read_accounts_from_file,
     write_accounts_to_file,
     write_regions_to_file
-) 
+)
 
 from utils.utils import ValidationException
 from utils.log import get_logger
 from utils.constants import MEMBER_ACCOUNT_ROLE_NAME
 from utils.rds_mappings import (
-    is_extended_support_eligible,
+    is_engine_version_eligible,
     get_rds_instance_mapping,
+    load_rds_instance_mapping,
     get_rds_extended_support_pricing,
+    prefetch_rds_extended_support_pricing,
     get_rds_regions
 )
 
 LOGGER = get_logger(__name__)
 
-''' Build some local caches for -  
+''' Build some local caches for -
     1. RDS Regions
     2. RDS Instance Mapping
-    3. Cache for storing processed account IDs  
+    3. Cache for storing processed account ID & region pairs
 '''
 REGIONS = {}
 DB_INSTANCE_MAPPING = {}
 
-processed_accounts = []
+# The cache file is an append-only log with one processed account/region pair per line. It also records the csv file
+# of the run on a line starting with CACHE_OUTFILE_PREFIX, so that a resumed run appends to the same csv file.
+CACHE_FILE = '.tmp_accounts_cache.log'
+CACHE_OUTFILE_PREFIX = 'outfile='
+cache_file = None
+
+processed_accounts = set()
+cached_outfile = None
 try:
-    # Try to load processed accounts from cache file
-    with open('.tmp_accounts_cache.json', encoding="utf-8") as f:
-        processed_accounts = json.load(f)
-        LOGGER.info(f'Found a previous cache file with {len(processed_accounts)} accounts aready processed. Continuing with remaining accounts...')
+    # Try to load processed account/region pairs and the csv file of the previous run from cache file
+    with open(CACHE_FILE, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith(CACHE_OUTFILE_PREFIX):
+                cached_outfile = line[len(CACHE_OUTFILE_PREFIX):]
+            elif line:
+                processed_accounts.add(line)
+        LOGGER.info(f'Found a previous cache file with {len(processed_accounts)} account/region pairs aready processed. Continuing with remaining accounts & regions...')
 except:
     pass
 
-# Use a thread lock  
+# Use a thread lock
 lock = threading.Lock()
 
+# Separate lock for regenerating DB_INSTANCE_MAPPING, so the scrape does not block the csv & cache writes
+db_instance_mapping_lock = threading.Lock()
+db_instance_mapping_refreshed = False
+
+# Eligible instances are buffered and appended to the csv file in batches of at least FLUSH_THRESHOLD rows,
+# instead of opening the file once per account/region. The cache keys are only persisted once their rows are written.
+FLUSH_THRESHOLD = 5000
+pending_rows = []
+pending_cache_keys = []
+
+# Rows are appended to the csv file through a single csv writer, opened once in main
+csv_file = None
+csv_writer = None
+
+# Account/region pairs skipped because the region is not enabled for the account. Region enablement is per account,
+# so they are reported at the end of the run for the user to leave them out of a --regions-file on subsequent runs.
+disabled_account_regions = set()
+
+# The scan is I/O bound, so use a few threads per CPU, capped to limit API throttling and connection pool contention
+DEFAULT_MAX_WORKERS = min(64, (os.cpu_count() or 4) * 5)
+
 # check if `output` directory exists in current working dir, if not create it.
 if not os.path.isdir('./output'):
     LOGGER.debug("'output' folder does not exist, creating it now")
     os.makedirs('./output')
 
-# create a filename using today's date time in YY-MM-DD HH-MM format
-outfile = f'./output/rds_extended_support_instances-{datetime.now().strftime("%Y-%m-%d %H-%M")}.csv'
-LOGGER.info("Outfile name: {}".format(outfile))
+# A resumed run appends to the csv file of the previous run, otherwise create a filename using today's date time
+# in YY-MM-DD HH-MM format
+if cached_outfile:
+    outfile = cached_outfile
+    LOGGER.info("Resuming previous run, appending to outfile: {}".format(outfile))
+else:
+    outfile = f'./output/rds_extended_support_instances-{datetime.now().strftime("%Y-%m-%d %H-%M")}.csv'
+    LOGGER.info("Outfile name: {}".format(outfile))
+
+
+# boto3 sessions are not thread safe, so each worker thread builds its clients from its own session.
+# All clients share a config with adaptive retries.
+thread_local = threading.local()
+BOTO_CONFIG = Config(max_pool_connections=100, retries={'max_attempts': 10, 'mode': 'adaptive'})
+
+# The partition is constant for the whole run, so it is resolved once in main to build the member role ARNs
+PARTITION = None
+
+
+def get_boto3_session():
+    session = getattr(thread_local, 'session', None)
+    if session is None:
+        session = boto3.session.Session()
+        thread_local.session = session
+    return session
+
+
+# Cache of the member account role credentials, keyed by account ID. Credentials are reused across regions
+# until they are about to expire, so a linked account is only assumed once instead of once per region.
+assumed_credentials = {}
+assumed_credentials_locks = {}
+CREDENTIALS_EXPIRY_MARGIN = timedelta(seconds=300)
+
+
+def get_assumed_credentials(account_id_, partition_, assume_role=MEMBER_ACCOUNT_ROLE_NAME):
+    # Use a lock per account so that threads for different accounts do not wait on each other
+    with lock:
+        account_lock = assumed_credentials_locks.setdefault(account_id_, threading.Lock())
+    with account_lock:
+        credentials = assumed_credentials.get(account_id_)
+        if credentials and credentials['Expiration'] - datetime.now(timezone.utc) > CREDENTIALS_EXPIRY_MARGIN:
+            LOGGER.debug(f"Reusing cached credentials for account {account_id_}")
+            return credentials
+        LOGGER.debug(f"Assuming role {assume_role} in account {account_id_}")
+        sts_client = get_boto3_session().client('sts', config=BOTO_CONFIG)
+        assumed_role_object = sts_client.assume_role(
+            RoleArn=f'arn:{partition_}:iam::{account_id_}:role/{assume_role}',
+            # A stable session name per account, which also makes the sessions easy to correlate in CloudTrail
+            RoleSessionName=f'RDSExtendedSupportCostEstimator-{account_id_}'[:64]
+        )
+        credentials = assumed_role_object['Credentials']
+        assumed_credentials[account_id_] = credentials
+        return credentials
 
 
-def get_rds_client(account_id_, payer_account_, region_, assume_role=MEMBER_ACCOUNT_ROLE_NAME):
+def get_rds_client(account_id_, payer_account_, region_, partition_, assume_role=MEMBER_ACCOUNT_ROLE_NAME):
     if account_id_ == payer_account_:
         LOGGER.debug("Running for Payer account, returning rds boto3 client")
-        rds_client = boto3.client('rds', region_name=region_)
+        rds_client = get_boto3_session().client('rds', region_name=region_, config=BOTO_CONFIG)
     else:
         LOGGER.debug("Running for Linked account, assuming custom role and returning rds boto3 client after extracting credentials")
-        sts_client = boto3.client('sts')
-        partition = sts_client.meta.partition
-        assumed_role_object = sts_client.assume_role(
-            RoleArn=f'arn:{partition}:iam::{account_id_}:role/{assume_role}',
-            RoleSessionName=f'AssumeRoleSession{uuid.uuid4()}'
-        )
-        credentials = assumed_role_object['Credentials']
-        rds_client = boto3.client(
+        credentials = get_assumed_credentials(account_id_, partition_, assume_role)
+        rds_client = get_boto3_session().client(
             'rds',
             region_name=region_,
+            config=BOTO_CONFIG,
             aws_access_key_id=credentials['AccessKeyId'],
             aws_secret_access_key=credentials['SecretAccessKey'],
             aws_session_token=credentials['SessionToken'],
         )
     return rds_client
 
+# Fields of a DB instance description that are kept for the csv output
+INSTANCE_KEYS = ('DBInstanceIdentifier', 'DBInstanceClass', 'Engine', 'EngineVersion', 'DBInstanceStatus', 'MultiAZ', 'DBInstanceArn')
+
+OUTPUT_COLUMNS = [*INSTANCE_KEYS, 'AccountId', 'Region', 'RegionName', 'vCPUs per instance', 'Total vCPUs (if MultiAZ)', 'Year 1 Price', 'Year 2 Price', 'Year 3 Price']
+
 # Iterate through all rds instances and return details including current rds version
-def get_rds_instances(rds_client):
+def get_rds_instances(rds_client, account_id_):
     rds_instances = []
     paginator = rds_client.get_paginator('describe_db_instances')
     try:
-        for page in paginator.paginate(Filters=[{'Name': 'engine', 'Values':['aurora-postgresql', 'aurora-mysql', 'mysql', 'postgres']}]):
+        # Request the maximum page size of 100 records to minimize the number of DescribeDBInstances round trips
+        for page in paginator.paginate(Filters=[{'Name': 'engine', 'Values':['aurora-postgresql', 'aurora-mysql', 'mysql', 'postgres']}],
+                                       PaginationConfig={'PageSize': 100}):
+            # Only keep the fields written to the csv, instead of the full DBInstance description
             for instance in page['DBInstances']:
-                rds_instances.append(instance)
+                rds_instances.append({key: instance.get(key) for key in INSTANCE_KEYS})
     except ClientError as err:
         if err.response["Error"]["Code"] == "InvalidClientTokenId":
             LOGGER.error("Received InvalidClientTokenId error - perhaps Region {} is not enabled for the account. Skipping region ...".format(rds_client.meta.region_name))
+            with lock:
+                disabled_account_regions.add(get_cache_key(account_id_, rds_client.meta.region_name))
             #raise ValidationException("Script can only be run in regions that have been enabled")
         else:
             raise err
@@ -117,118 +195,169 @@ def get_rds_instances(rds_client):
         raise err
     return rds_instances
 
-def get_rds_extended_support_instances(account_id, caller_account):
+def get_cache_key(account_id, region):
+    """ Key used to track a processed account/region pair in the cache file """
+    return f'{account_id}:{region}'
+
+def refresh_db_instance_mapping(unknown_instance_classes):
+    """
+    Regenerate the entire mapping by scrapping the AWS Documentation HTML page. The mapping lock ensures that
+    concurrent threads missing the same instance classes scrape the page at most once per run.
+    """
     global DB_INSTANCE_MAPPING
-    keys = ['DBInstanceIdentifier', 'DBInstanceClass', 'Engine', 'EngineVersion', 'DBInstanceStatus', 'MultiAZ', 'DBInstanceArn']
+    global db_instance_mapping_refreshed
+    with db_instance_mapping_lock:
+        # Another thread may have already regenerated the mapping while this one was waiting for the lock
+        if db_instance_mapping_refreshed or not (unknown_instance_classes - DB_INSTANCE_MAPPING.keys()):
+            return
+        LOGGER.error(f'Instance types {sorted(unknown_instance_classes)} not found in the RDS db instance mapping. Refreshing the mapping from AWS documentation')
+        DB_INSTANCE_MAPPING = get_rds_instance_mapping()
+        db_instance_mapping_refreshed = True
+        LOGGER.info(f'Updated DB Instance Mapping: {DB_INSTANCE_MAPPING}')
+
+def process_account_region(account_id, caller_account, region):
     rds_extended_support_instances = []
-    
-    #### OVERRIDE - FOR TESTING ###
-    #REGIONS = {'us-east-1':'US East (N. Virginia)', 'us-west-2': 'US West (Oregon)', 'eu-west-1': 'Europe (Ireland)'}
-    #### OVERRIDE - FOR TESTING ###
 
-    #TODO: Handle Aurora Serverless v2 instances 
-    for region in REGIONS:
-        LOGGER.info(f'Running for account {account_id} in region {region}')
-        rds_client = get_rds_client(account_id, caller_account, region)
-        rds_instances = get_rds_instances(rds_client)
-        LOGGER.info(f'Found {len(rds_instances)} RDS instances in account {account_id} in region {region}')
-
-        for instance in rds_instances:
-            LOGGER.debug(f'==> Instance: {instance}')
-            if is_extended_support_eligible(instance):
-                LOGGER.debug(f'Instance is eligible for extended support')
-                shortlist_instance = {key: instance[key] for key in keys}
-                shortlist_instance['AccountId'] = account_id
-                shortlist_instance['Region'] = region
-                shortlist_instance['RegionName'] = REGIONS[region]
-                # Handle the case where an instance type is not found in rds_instance_mapping.json (perhaps its a new family/size added)
-                # We will just regenrate the entire mapping by scrapping the AWS Documentation HTML page. 
-                if shortlist_instance['DBInstanceClass'] not in DB_INSTANCE_MAPPING:
-                    LOGGER.error(f'Instance type {shortlist_instance["DBInstanceClass"]} not found in rds_instance_mapping.json. Regenerating json file from AWS documentation')
-                    DB_INSTANCE_MAPPING = get_rds_instance_mapping()
-                    LOGGER.info(f'Updated DB Instance Mapping: {DB_INSTANCE_MAPPING}')
-                shortlist_instance['vCPUs per instance'] = DB_INSTANCE_MAPPING[shortlist_instance['DBInstanceClass']]
-
-                rds_extended_support_instances.append(shortlist_instance)
-
-    LOGGER.info(f'RDS Extended Support Eligible Instances: \n {rds_extended_support_instances}')
-    
+    #TODO: Handle Aurora Serverless v2 instances
+    LOGGER.info(f'Running for account {account_id} in region {region}')
+    rds_client = get_rds_client(account_id, caller_account, region, PARTITION)
+    rds_instances = get_rds_instances(rds_client, account_id)
+    LOGGER.info(f'Found {len(rds_instances)} RDS instances in account {account_id} in region {region}')
+
+    for instance in rds_instances:
+        LOGGER.debug('==> Instance: %s', instance)
+        if is_engine_version_eligible(instance['Engine'], instance['EngineVersion']):
+            LOGGER.debug(f'Instance is eligible for extended support')
+            instance['AccountId'] = account_id
+            instance['Region'] = region
+            instance['RegionName'] = REGIONS[region]
+            rds_extended_support_instances.append(instance)
+
+    # Handle the case where an instance type is not found in rds_instance_mapping.json (perhaps its a new family/size added)
+    unknown_instance_classes = {instance['DBInstanceClass'] for instance in rds_extended_support_instances} - DB_INSTANCE_MAPPING.keys()
+    if unknown_instance_classes:
+        refresh_db_instance_mapping(unknown_instance_classes)
+    for instance in rds_extended_support_instances:
+        instance['vCPUs per instance'] = DB_INSTANCE_MAPPING[instance['DBInstanceClass']]
+
+    # Use lazy %-formatting, so the full list is only formatted when debug logging is enabled
+    LOGGER.info('Found %d RDS Extended Support eligible instances in account %s in region %s', len(rds_extended_support_instances), account_id, region)
+    LOGGER.debug('RDS Extended Support Eligible Instances: \n %s', rds_extended_support_instances)
+    return rds_extended_support_instances
+
+
+def save_account_region(account_id, region, rds_extended_support_instances):
+    """
+    Price the eligible instances of an account/region pair and buffer them, flushing them to the csv file once enough
+    rows are pending. Pricing happens per pair, so a pricing failure only fails this pair and not the buffered batch.
+    """
+    rows = get_extended_support_rows(rds_extended_support_instances)
     with lock:
-        save_to_csv(rds_extended_support_instances)
-        processed_accounts.append(account_id)
-        with open('.tmp_accounts_cache.json', 'w', encoding="utf-8") as f:
-            json.dump(processed_accounts, f)
-        
-        LOGGER.info(f'Saved eligible RDS instances in all regions from {account_id} to csv file, and added account to cache file')
-
-
-def save_to_csv(rds_extended_support_instances):
-    
-    def get_total_vcpus(row):
-        return 2*int(row['vCPUs per instance']) if row['MultiAZ'] == True else int(row['vCPUs per instance'])
-    
-    def get_y1_price(row):
-        (provisioned_price_map, _) = get_rds_extended_support_pricing(row['Engine'].split('-')[0])
-        region_name = row['Region']
-        yr_1_2_price = provisioned_price_map[region_name]['yr_1_2_price']
-        return row['Total vCPUs (if MultiAZ)'] * yr_1_2_price * 24 * 365 # extended support price is per vCPU-hour
-    def get_y3_price(row):
+        pending_rows.extend(rows)
+        pending_cache_keys.append(get_cache_key(account_id, region))
+        if rows:
+            LOGGER.info(f'Buffered {len(rows)} eligible RDS instances from account {account_id} in region {region}')
+        if len(pending_rows) < FLUSH_THRESHOLD:
+            return
+    flush_pending_rows()
+
+
+def flush_pending_rows():
+    """
+    Write the buffered, already priced rows to the csv file in a single append and add their account/region pairs
+    to the cache file.
+    """
+    with lock:
+        rows = pending_rows[:]
+        cache_keys = pending_cache_keys[:]
+        pending_rows.clear()
+        pending_cache_keys.clear()
+    if len(cache_keys) == 0:
+        return
+
+    with lock:
+        csv_writer.writerows(rows)
+        # Make sure the rows reach the file before their account/region pairs are marked as processed
+        csv_file.flush()
+        processed_accounts.update(cache_keys)
+        cache_file.writelines(f'{key}\n' for key in cache_keys)
+
+    LOGGER.info(f'Saved {len(rows)} eligible RDS instances from {len(cache_keys)} account/region pairs to csv file, and added them to cache file')
+
+
+def get_extended_support_rows(rds_extended_support_instances):
+    """ Add the vCPU totals and yearly extended support prices to the eligible instances """
+    if len(rds_extended_support_instances) == 0:
+        return []
+
+    prefetch_rds_extended_support_pricing(row['Engine'].split('-')[0] for row in rds_extended_support_instances)
+    for row in rds_extended_support_instances:
+        vcpus = int(row['vCPUs per instance'])
+        total_vcpus = 2*vcpus if row['MultiAZ'] == True else vcpus
+
+        # Pricing is cached per engine family, so this is a dict lookup after the first call
         (provisioned_price_map, _) = get_rds_extended_support_pricing(row['Engine'].split('-')[0])
-        region_name = row['Region']
+        region_price_map = provisioned_price_map[row['Region']]
+        yr_1_2_price = region_price_map['yr_1_2_price']
         '''
         Per the Amazon RDS Aurora pricing page (https://aws.amazon.com/rds/aurora/pricing/#Amazon_RDS_Extended_Support_costs)
         Amazon RDS Extended Support year 3 pricing is only available for Amazon Aurora PostgreSQL-Compatible Edition.
-        Extended Support for Amazon Aurora MySQL comptible engine is charged at Year 1 prices for the entire duration 
+        Extended Support for Amazon Aurora MySQL comptible engine is charged at Year 1 prices for the entire duration
         of Extended Support for the respective major version.
         '''
         if ("mysql_aurora.2.11" in row['EngineVersion']) or ("mysql_aurora.2.12" in row['EngineVersion']):
-            yr_3_price = provisioned_price_map[region_name]['yr_1_2_price']
+            yr_3_price = yr_1_2_price
         else:
-            yr_3_price = provisioned_price_map[region_name]['yr_3_price']
-        return row['Total vCPUs (if MultiAZ)'] * yr_3_price * 24 * 365 # extended support price is per vCPU-hour
-    
-    if len(rds_extended_support_instances) == 0:
-        LOGGER.info('No RDS instances are eligible for extended support. Not writing anything to CSV for this account')
-        return
-
-    df = pd.DataFrame.from_dict(rds_extended_support_instances)
-    
-    df['Total vCPUs (if MultiAZ)'] = df.apply(lambda row: get_total_vcpus(row), axis=1)
-    df['Year 1 Price'] = df.apply(lambda row: get_y1_price(row), axis=1)
-    df['Year 1 Price'] = df['Year 1 Price'].apply(lambda x: "${0:,.2f}".format(x))
-    df['Year 2 Price'] = df['Year 1 Price']
-    df['Year 3 Price'] = df.apply(lambda row: get_y3_price(row), axis=1)
-    df['Year 3 Price'] = df['Year 3 Price'].apply(lambda x: "${0:,.2f}".format(x))
-    #df.loc['Total'] = pd.Series(df['Year 1 Price'].sum(), index=['Year 1 Price'])
-    #print(df.head())
+            yr_3_price = region_price_map['yr_3_price']
 
-    df.to_csv(outfile, mode='a', index=False, header=False)
+        row['vCPUs per instance'] = vcpus
+        row['Total vCPUs (if MultiAZ)'] = total_vcpus
+        # extended support price is per vCPU-hour
+        row['Year 1 Price'] = "${0:,.2f}".format(total_vcpus * yr_1_2_price * 24 * 365)
+        row['Year 2 Price'] = row['Year 1 Price']
+        row['Year 3 Price'] = "${0:,.2f}".format(total_vcpus * yr_3_price * 24 * 365)
 
     #TODO: Add more details about dates for EoS, Start of Y1, Y3 Extended Suport price etc.
+    return rds_extended_support_instances
+
+
+def convert_output(output_format):
+    """ Convert the final csv file to the requested columnar format and return the converted file name """
+    # pyarrow is only needed for the columnar formats, so only import it when converting
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+
+    # Read account IDs as strings so that leading zeros are preserved
+    table = pa_csv.read_csv(outfile, convert_options=pa_csv.ConvertOptions(column_types={'AccountId': pa.string()}))
+    converted_outfile = f'{os.path.splitext(outfile)[0]}.{output_format}'
+    if output_format == 'parquet':
+        pa_parquet.write_table(table, converted_outfile, compression='zstd')
+    else:
+        pa_feather.write_feather(table, converted_outfile, compression='zstd')
+    return converted_outfile
 
 
 def main():
     global REGIONS
+    global PARTITION
+    global cache_file
+    global csv_file
+    global csv_writer
     global DB_INSTANCE_MAPPING
     args = parse_args()
     sts_client = boto3.client('sts')
     org_client = boto3.client('organizations')
     LOGGER.info("Running with boto client region = %s", sts_client.meta.region_name)
-    
+
     caller_account = sts_client.get_caller_identity()['Account']
+    PARTITION = sts_client.meta.partition
     is_china = is_china_region(sts_client)
     validate_if_being_run_by_payer_account(org_client, caller_account)
     LOGGER.info(f'Caller account: {caller_account}')
 
-    # Check if the mapping file exists, if it does, read from it
-    try:
-        # Try to load rds instane mapping json file
-        with open('rds_instance_mapping.json') as f:
-            DB_INSTANCE_MAPPING = json.load(f)
-            LOGGER.debug(f'Read RDS db instance mapping from file rds_instance_mapping.json')
-    except:
-        LOGGER.debug("No RDS db instance mapping file found, getting mapping from AWS Pricing page")
-        DB_INSTANCE_MAPPING = get_rds_instance_mapping()
+    DB_INSTANCE_MAPPING = load_rds_instance_mapping()
 
     REGIONS = get_rds_regions(args.regions_file)
     if args.generate_regions_file:
@@ -240,17 +369,15 @@ def main():
         account_pool = get_all_org_accounts(org_client)
         write_accounts_to_file(account_pool)
         LOGGER.info(f'Saved AWS Accounts in Organization to file: accounts.csv. Script will ignore any other inputs and exit.')
-        sys.exit(0) 
+        sys.exit(0)
 
     if args.all:
         LOGGER.info(f'Running in ORG mode for payer account: {caller_account}')
         account_pool = get_all_org_accounts(org_client)
         if args.exclude_accounts:
             LOGGER.info(f'Excluding accounts: {args.exclude_accounts}')
-            exclude_accounts = [account.strip() for account in args.exclude_accounts.split(",")]
-            for account in exclude_accounts:
-                if account in account_pool:
-                    account_pool.remove(account)
+            exclude_accounts = {account.strip() for account in args.exclude_accounts.split(",")}
+            account_pool = [account for account in account_pool if account not in exclude_accounts]
     elif args.accounts:
         if args.exclude_accounts:
             raise ValidationException('Invalid input: cannot use --exclude-accounts with --accounts argument')
@@ -271,38 +398,94 @@ def main():
 
     LOGGER.info(f'Running in specific regions: {REGIONS}')
 
-    df = pd.DataFrame(columns=['DBInstanceIdentifier', 'DBInstanceClass', 'Engine', 'EngineVersion', 'DBInstanceStatus', 'MultiAZ', 'DBInstanceArn', 'AccountId', 'Region', 'RegionName', 'vCPUs per instance', 'Total vCPUs (if MultiAZ)', 'Year 1 Price', 'Year 2 Price', 'Year 3 Price' ])
-    df.to_csv(outfile, index=False)
-    
-    with ThreadPoolExecutor(max_workers=100) as executor:
-        futures = { executor.submit(get_rds_extended_support_instances, account, caller_account) 
-                   for account in account_pool 
-                   if account not in processed_accounts }
-        # Catch a thread's exceptions, if any, in the main thread
+    # Only write the header when creating the file, so that a resumed run appending to the previous run's output file
+    # does not repeat it
+    write_header = not os.path.exists(outfile)
+    csv_file = open(outfile, 'a', encoding="utf-8", newline='')
+    csv_writer = csv.DictWriter(csv_file, fieldnames=OUTPUT_COLUMNS)
+    if write_header:
+        csv_writer.writeheader()
+
+    #### OVERRIDE - FOR TESTING ###
+    #REGIONS = {'us-east-1':'US East (N. Virginia)', 'us-west-2': 'US West (Oregon)', 'eu-west-1': 'Europe (Ireland)'}
+    #### OVERRIDE - FOR TESTING ###
+
+    # Open the cache file once, line buffered, so that each processed account/region pair is persisted as it is appended
+    cache_file = open(CACHE_FILE, 'a', encoding="utf-8", buffering=1)
+    if cached_outfile != outfile:
+        cache_file.write(f'{CACHE_OUTFILE_PREFIX}{outfile}\n')
+
+    # Fan out one task per (account, region) pair, so that regions of the same account are also processed in parallel
+    LOGGER.info(f'Running with {args.max_workers} worker threads')
+    with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
+        futures = { executor.submit(process_account_region, account, caller_account, region): (account, region)
+                   for account in account_pool
+                   for region in REGIONS
+                   if get_cache_key(account, region) not in processed_accounts }
+        # Catch a thread's exceptions, if any, in the main thread. A failed account/region pair does not stop the
+        # other tasks, so that all successful results are saved before the script exits.
         # https://docs.python.org/3.7/library/concurrent.futures.html#concurrent.futures.as_completed
-        for future in as_completed(futures):
+        failures = []
+        try:
+            for future in as_completed(futures):
+                account, region = futures[future]
+                try:
+                    save_account_region(account, region, future.result())
+                except Exception as e:
+                    LOGGER.error(f"Error in processing account {account} in region {region}. Exception: {e}")
+                    failures.append((account, region, e))
+        finally:
+            # Write out the remaining buffered rows, so that completed account/region pairs are not lost on failure,
+            # and always close the files even if that write fails
             try:
-                future.result()
-            except Exception as e:
-                LOGGER.error(f"Error in processing account. Exception: {e}")
-                raise
+                flush_pending_rows()
+            finally:
+                csv_file.close()
+                cache_file.close()
+
+    if failures:
+        LOGGER.error("="*25)
+        LOGGER.error(f'Failed to process {len(failures)} account/region pairs:')
+        for (account, region, e) in failures:
+            LOGGER.error(f'  account {account} in region {region}: {e}')
+        LOGGER.error(f'Results of the successful account/region pairs are saved to CSV file: {outfile}. '
+                     f'Re-run the script to retry only the failed pairs, their results will be appended to {outfile}')
+        LOGGER.error("="*25)
+        sys.exit(1)
+
+    if args.output_format != 'csv':
+        converted_outfile = convert_output(args.output_format)
+        LOGGER.info(f'Converted CSV file to {args.output_format} file: {converted_outfile}')
 
 
+    if disabled_account_regions:
+        LOGGER.warning(f'Skipped {len(disabled_account_regions)} account/region pairs where the region is not enabled: {sorted(disabled_account_regions)}')
+
     LOGGER.info("="*25)
     LOGGER.info(f'Saved Final results to CSV file: {outfile} and deleting cached data')
     LOGGER.info("Script Execution Completed Successfully!")
     LOGGER.info("="*25)
-    
-    # If we have reached this point, script has been successfully executed for all accounts & regions. 
-    # So, delete the .tmp_accounts_cache.json file.
-    if os.path.exists('.tmp_accounts_cache.json'):
-        os.remove('.tmp_accounts_cache.json')
 
- 
+    # If we have reached this point, script has been successfully executed for all accounts & regions.
+    # So, delete the cache file.
+    if os.path.exists(CACHE_FILE):
+        os.remove(CACHE_FILE)
+
+
+
+def positive_int(value):
+    """ argparse type for arguments that must be an integer of at least 1 """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value} is not an integer')
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} must be at least 1')
+    return number
 
 def parse_args():
     arg_parser = argparse.ArgumentParser()
-    
+
     group = arg_parser.add_mutually_exclusive_group()
     group.add_argument('-a', '--accounts', help='comma separated list of AWS account IDs', type=str)
     group.add_argument('--accounts-file', help='Absolute path of the CSV file containing AWS account IDs', type=str)
@@ -315,6 +498,18 @@ def parse_args():
             is used', type=str
     )
 
+    arg_parser.add_argument(
+        '--max-workers',
+        help=f'Number of worker threads used to scan account/region pairs in parallel (default: {DEFAULT_MAX_WORKERS})',
+        type=positive_int, default=DEFAULT_MAX_WORKERS
+    )
+
+    arg_parser.add_argument(
+        '--output-format',
+        help='Format of the final output file. The csv file is always created, parquet & feather files are created from it',
+        choices=['csv', 'parquet', 'feather'], default='csv'
+    )
+
     arg_parser.add_argument('--generate-accounts-file', help='Creates a `accounts.csv` CSV file containing all AWS accounts in the AWS Organization', action='store_true')
     arg_parser.add_argument('--generate-regions-file', help='Creates a `regions.csv` CSV file containing all AWS regions', action='store_true')
 
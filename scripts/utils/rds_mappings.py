@@ -1,111 +1,301 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
-import boto3
+import os
+import time
+import re
 import json
+import hashlib
+import threading
+from datetime import date
+from collections import namedtuple
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    # orjson decodes the Pricing API price list entries several times faster than the json module
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 from utils.log import get_logger
 from utils.utils import read_regions_from_file
 from utils.utils import ValidationException
 
 LOGGER = get_logger(__name__)
 
+"""
+Support dates of an engine major version, yr3_start is None when there is no year 3 pricing,
+aurora_major_version and eligible_minor are only set for Aurora
+"""
+SupportDates = namedtuple('SupportDates', [
+    'community_eol',
+    'rds_standard_eos',
+    'yr1_start',
+    'yr3_start',
+    'rds_extended_eos',
+    'aurora_major_version',
+    'eligible_minor'
+], defaults=(None, ()))
+
 AURORA_EXTENDED_SUPPORT_VERSION = {
-        "mysql-5.7":{
-            "aurora-major-version": "mysql-aurora-2",
-            "community-eol-date": "10-31-2023",
-            "rds-standard-eos-date": "10-31-2024",
-            "rds-extended-support-yr1-stat-date": "12-01-2024",
-            "rds-extended-support-yr3-stat-date": "N/A",
-            "rds-extended-eos-date": "02-28-2025",
-            "minor-versions-eligible-extended-support": ["mysql_aurora-2.11", "mysql_aurora-2.12"]
-        },
-        "postgres-11": {
-            "aurora-major-version": "postgres-aurora-3",
-            "community-eol-date": "11-30-2023",
-            "rds-standard-eos-date": "02-29-2024",
-            "rds-extended-support-yr1-stat-date": "04-01-2024",
-            "rds-extended-support-yr3-stat-date": "04-01-2026",
-            "rds-extended-eos-date": "03-31-2027",
-            "minor-versions-eligible-extended-support": ["postgres-aurora-11.9", "postgres-aurora-11.21"]
-    
-        }
+        "mysql-5.7": SupportDates(
+            aurora_major_version="mysql-aurora-2",
+            community_eol=date(2023, 10, 31),
+            rds_standard_eos=date(2024, 10, 31),
+            yr1_start=date(2024, 12, 1),
+            yr3_start=None,
+            rds_extended_eos=date(2025, 2, 28),
+            eligible_minor=("mysql_aurora-2.11", "mysql_aurora-2.12")
+        ),
+        "postgres-11": SupportDates(
+            aurora_major_version="postgres-aurora-3",
+            community_eol=date(2023, 11, 30),
+            rds_standard_eos=date(2024, 2, 29),
+            yr1_start=date(2024, 4, 1),
+            yr3_start=date(2026, 4, 1),
+            rds_extended_eos=date(2027, 3, 31),
+            eligible_minor=("postgres-aurora-11.9", "postgres-aurora-11.21")
+        )
     }
 
 RDS_EXTENDED_SUPPORT_VERSION = {
-        "mysql-5.7":{
-            "community-eol-date": "10-31-2023",
-            "rds-standard-eos-date": "02-29-2024",
-            "rds-extended-support-yr1-stat-date": "03-01-2024",
-            "rds-extended-support-yr3-stat-date": "03-01-2026",
-            "rds-extended-eos-date": "02-28-2027",
-        },
-        "postgres-11": {
-            "community-eol-date": "11-09-2023",
-            "rds-standard-eos-date": "02-29-2024",
-            "rds-extended-support-yr1-stat-date": "04-01-2024",
-            "rds-extended-support-yr3-stat-date": "04-01-2026",
-            "rds-extended-eos-date": "03-31-2027",
-        }
+        "mysql-5.7": SupportDates(
+            community_eol=date(2023, 10, 31),
+            rds_standard_eos=date(2024, 2, 29),
+            yr1_start=date(2024, 3, 1),
+            yr3_start=date(2026, 3, 1),
+            rds_extended_eos=date(2027, 2, 28)
+        ),
+        "postgres-11": SupportDates(
+            community_eol=date(2023, 11, 9),
+            rds_standard_eos=date(2024, 2, 29),
+            yr1_start=date(2024, 4, 1),
+            yr3_start=date(2026, 4, 1),
+            rds_extended_eos=date(2027, 3, 31)
+        )
     }
 
-aurora_provisioned_price_map = {}
-aurora_serverless_v2_price_map = {}
-db_engine_price_map = {}
+# Bundled db instance class -> vCPUs mapping, kept next to the scripts so it is found whatever the working directory
+RDS_INSTANCE_MAPPING_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rds_instance_mapping.json')
+
+# Parsed AWS documentation pages and Pricing API results are cached on disk, and reused for a day before the page is
+# revalidated or the prices are fetched again
+HTTP_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'rds-ext-support')
+HTTP_CACHE_TTL = 86400
+
+# Instance classes scraped from the AWS documentation are merged over the bundled mapping and saved in the cache
+# directory, the bundled file in the repo is never modified
+RDS_INSTANCE_MAPPING_CACHE_FILE = os.path.join(HTTP_CACHE_DIR, 'rds_instance_mapping.json')
+
+# Anchors of the scraped AWS documentation tables, and the only tags the pull parser reports for each page
+REGIONS_ANCHOR_ID = 'Concepts.RegionsAndAvailabilityZones.Availability'
+REGIONS_TAGS = ('h3', 'table', 'tr')
+INSTANCE_MAPPING_BODY_ID = 'main-col-body'
+INSTANCE_MAPPING_TAGS = ('div', 'tr')
+
+# Shared session, so the AWS documentation pages fetched in a run reuse pooled keep-alive connections
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.2)))
+
+# Extended support prices per db engine, the per engine locks make concurrent callers wait for a single
+# Pricing API fetch of that engine, while different engines are fetched concurrently
+price_cache = {}
+price_cache_locks = {}
+# Pricing API client shared by the engine threads, created once by get_pricing_client
+pricing_client = None
+pricing_client_lock = threading.Lock()
+
+def cached_get(url, parse, ttl=HTTP_CACHE_TTL):
+    """
+    Return parse(chunks) for the page at url, where chunks iterates over the response body as it downloads,
+    caching the parsed result on disk keyed by the url.
+    A cached result younger than ttl seconds is returned without any request. An older one is revalidated with a
+    conditional GET (If-None-Match / If-Modified-Since), and reused without parsing again if the page is not modified.
+    """
+    cache_path = os.path.join(HTTP_CACHE_DIR, f'{hashlib.sha1(url.encode("utf-8")).hexdigest()}.json')
+    cached = None
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        LOGGER.debug(f'No cached response found for {url}')
+    if cached and not cached.get('parsed'):
+        cached = None   # an empty result cached by an older version, fetch and parse the page again
+
+    if cached and time.time() - cached['fetched_at'] < ttl:
+        LOGGER.debug(f'Using cached response for {url}')
+        return cached['parsed']
+
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+    with http_session.get(url, headers=headers, timeout=10, stream=True) as response:    # 10 seconds
+        response.raise_for_status()
 
-def get_rds_regions(regions_file_path):
+        if response.status_code == 304 and cached:
+            LOGGER.debug(f'{url} is not modified, using cached response')
+            parsed = cached['parsed']
+        else:
+            parsed = parse(response.iter_content(chunk_size=64 * 1024))
+
+    if not parsed:
+        # Never cache an empty result, so a bad page is fetched again instead of being reused for a day
+        LOGGER.debug(f'Not caching the empty result parsed from {url}')
+        return parsed
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w', encoding="utf-8") as f:
+            json.dump({
+                'url': url,
+                # A 304 may leave out the validators, keep the cached ones so later requests stay conditional
+                'etag': response.headers.get('ETag') or (cached or {}).get('etag'),
+                'last_modified': response.headers.get('Last-Modified') or (cached or {}).get('last_modified'),
+                'fetched_at': time.time(),
+                'parsed': parsed
+            }, f)
+    except OSError as e:
+        LOGGER.debug(f'Failed to write the cached response for {url}: {e}')
+    return parsed
+
+@functools.lru_cache(maxsize=1)
+def get_lxml_etree():
+    """
+    lxml parses the AWS documentation pages incrementally as they download, and much faster than BeautifulSoup's
+    pure python parser. It is only imported once a page is actually parsed, as parsed pages are usually cached on disk.
+    Returns None if lxml is not installed, in which case BeautifulSoup is used as a fallback.
+    """
+    try:
+        from lxml import etree
+        return etree
+    except ImportError:
+        return None
+
+def iter_html_events(chunks, tags):
+    """
+    Feed the html page to lxml's pull parser chunk by chunk, and yield the (event, element) start/end events
+    for the given tags as soon as they are parsed
+    """
+    parser = get_lxml_etree().HTMLPullParser(events=('start', 'end'), tag=tags)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+def get_row_texts(row):
+    texts = [''.join(td.itertext()) for td in row.iterchildren('td')]
+    row.clear()     # the cells are no longer needed once read, keep the parsed tree small
+    return texts
+
+def parse_rds_regions(chunks):
+    if get_lxml_etree() is not None:
+        # The regions table is the first table after the regions availability heading, the page is not read any
+        # further once that table ends
+        rows = []
+        in_section = False
+        for event, elem in iter_html_events(chunks, REGIONS_TAGS):
+            if not in_section:
+                in_section = event == 'start' and elem.tag == 'h3' and elem.get('id') == REGIONS_ANCHOR_ID
+            elif event == 'end' and elem.tag == 'tr':
+                rows.append(get_row_texts(elem))
+            elif event == 'end' and elem.tag == 'table':
+                break
+        if not in_section:
+            raise Exception(f'Regions heading {REGIONS_ANCHOR_ID} not found in the AWS documentation page')
+        rows = rows[1:]     # skip the header row
+    else:
+        from bs4 import BeautifulSoup, SoupStrainer
+        # Only build the headings and tables, the regions table is found from its heading
+        soup = BeautifulSoup(b''.join(chunks), "html.parser", parse_only=SoupStrainer(["h3", "table"]))
+        regions_section = soup.find("h3", id=REGIONS_ANCHOR_ID)
+        if regions_section is None:
+            raise Exception(f'Regions heading {REGIONS_ANCHOR_ID} not found in the AWS documentation page')
+        table = regions_section.find_next("table")
+        rows = [[td.text for td in row.find_all("td")] for row in table.find_all("tr")[1:]]
+
+    #populate regions_map with all RDS supported regions, region id -> region name
+    regions_map = {cols[1].strip(): cols[0].strip() for cols in rows}
+    if not regions_map:
+        raise Exception('No regions found in the regions table of the AWS documentation page')
+    return regions_map
+
+"""
+Get all the RDS supported regions, fetched at most once per run
+"""
+@functools.lru_cache(maxsize=1)
+def get_all_rds_regions():
     LOGGER.debug("Extracting a list of AWS Regions for RDS")
     url = "https://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/Concepts.RegionsAndAvailabilityZones.html"
     try:
-        response = requests.get(url, timeout=10)    # 10 seconds
-        response.raise_for_status()
-    except Exception as e:
+        return cached_get(url, parse_rds_regions)
+    except requests.exceptions.RequestException as e:
         LOGGER.error(f'Failed to get a http response from {url} to get AWS regions, script exiting...')
         raise
-    soup = BeautifulSoup(response.content, "html.parser")
-
-    regions_section = soup.find("h3", {"id": "Concepts.RegionsAndAvailabilityZones.Availability"})
-    LOGGER.debug(f'Regions section: {regions_section}')
-
-    regions_section_tables = regions_section.find_all_next("table")
-    LOGGER.debug(f'Regions section tables: {regions_section_tables}')
-
-    # table = soup.find("table", {"id": "w1178aab5c45c29b7b9"})
-    table = regions_section_tables[0]
-    rows = table.find_all("tr")[1:]
 
-    regions_map = {}
-    #populate regions_map with all RDS supported regions
-    for row in rows:
-        cols = row.find_all("td")
-        region_name = cols[0].text.strip()
-        region_id = cols[1].text.strip()
-        regions_map[region_id] = region_name
+def get_rds_regions(regions_file_path):
+    regions_map = get_all_rds_regions()
 
     if not regions_file_path:   # user has not provided a regions file
-        LOGGER.debug(f'Regions map: {regions_map}')
+        LOGGER.debug('Regions map: %s', regions_map)
         LOGGER.debug(f'Number of regions: {len(regions_map)}')
         return regions_map
     else:   # user has provided a regions file, read the regions from the file and validate it
-        user_regions_list = read_regions_from_file(regions_file_path)
+        user_regions = set(read_regions_from_file(regions_file_path))
 
-        for r in user_regions_list:
-            if r not in regions_map:
-                LOGGER.error("User provided regions file has invalid regions. Please fix the file, making sure you enter AWS regions ids separated by newline. Please see README for instructions on how to generate a sample Regions file")
-                raise ValidationException('Invalid input: regions has invalid regions. Please fix the file & try again.')
+        invalid_regions = user_regions - regions_map.keys()
+        if invalid_regions:
+            LOGGER.error("User provided regions file has invalid regions. Please fix the file, making sure you enter AWS regions ids separated by newline. Please see README for instructions on how to generate a sample Regions file")
+            raise ValidationException(f'Invalid input: regions has invalid regions {sorted(invalid_regions)}. Please fix the file & try again.')
         
         # return map with only matching entries
-        regions_map = {k:v for k,v in regions_map.items() if k in user_regions_list}
+        regions_map = {k:v for k,v in regions_map.items() if k in user_regions}
 
-        LOGGER.debug(f'Filtered Regions map: {regions_map}')
+        LOGGER.debug('Filtered Regions map: %s', regions_map)
         LOGGER.debug(f'Number of regions: {len(regions_map)}')
         return regions_map    
 
+def parse_rds_instance_mapping(chunks):
+    if get_lxml_etree() is not None:
+        # Collect the table rows in the main documentation body, the page is not read any further once it ends
+        rows = []
+        body = None
+        for event, elem in iter_html_events(chunks, INSTANCE_MAPPING_TAGS):
+            if event == 'start':
+                if body is None and elem.tag == 'div' and elem.get('id') == INSTANCE_MAPPING_BODY_ID:
+                    body = elem
+            elif elem is body:
+                break
+            elif body is not None and elem.tag == 'tr':
+                rows.append(get_row_texts(elem))
+        if body is None:
+            raise Exception(f'Documentation body {INSTANCE_MAPPING_BODY_ID} not found in the AWS documentation page')
+    else:
+        from bs4 import BeautifulSoup, SoupStrainer
+        # Only build the main documentation body, the rest of the page is skipped
+        soup = BeautifulSoup(b''.join(chunks), "html.parser", parse_only=SoupStrainer("div", id=INSTANCE_MAPPING_BODY_ID))
+        #mappings_section = soup.find("h2", {"id": "Concepts.DBInstanceClass.Summary"})
+        mappings_section = soup.find("div", id=INSTANCE_MAPPING_BODY_ID)
+        if mappings_section is None:
+            raise Exception(f'Documentation body {INSTANCE_MAPPING_BODY_ID} not found in the AWS documentation page')
+        rows = [[td.text for td in row.find_all("td")] 
+                for table in mappings_section.find_all("table") 
+                for row in table.find_all("tr")]
+
+    # db instance class -> default vCPUs, rows with less than two cells are instance family headings
+    db_map = {cols[0].strip().strip('*'): cols[1].strip() for cols in rows if len(cols) > 1}
+    if not db_map:
+        raise Exception('No instance classes found in the tables of the AWS documentation page')
+    return db_map
+
 """
-Get a mapping of db instance types to the vCPUs used
+Get a mapping of db instance types to the vCPUs used, fetched at most once per run
 For eg: db.m6i.large = 2 vCPUs
 """
+@functools.lru_cache(maxsize=1)
 def get_rds_instance_mapping():
     LOGGER.debug("Extracting the vCPU to RDS Instance size mapping")
 
@@ -128,64 +318,118 @@ def get_rds_instance_mapping():
 
     '''
 
+    # The mapping is only fetched when an instance class is missing from rds_instance_mapping.json, 
+    # so always revalidate the page, and only skip parsing it when it has not been modified
     try:    
-        response = requests.get(url, timeout=10)    # 10 seconds
-        response.raise_for_status()
-    except Exception as e:
+        db_map = cached_get(url, parse_rds_instance_mapping, ttl=0)
+    except requests.exceptions.RequestException as e:
         LOGGER.error(f'Failed to get a http response from {url} to get RDS instance mappings, script exiting...')
         raise
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    #mappings_section = soup.find("h2", {"id": "Concepts.DBInstanceClass.Summary"})
-    mappings_section = soup.find("div", {"id": "main-col-body"})
-    LOGGER.debug(f'Mappings section: {mappings_section}')
+    # Keep the bundled instance classes that a partial scrape may have missed
+    db_map = {**read_rds_instance_mapping_file(RDS_INSTANCE_MAPPING_FILE), **db_map}
+    LOGGER.debug('DB Instance Mapping: %s', db_map)
+    
+    LOGGER.debug(f'Saving the DB Instance Mapping to {RDS_INSTANCE_MAPPING_CACHE_FILE}')
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(RDS_INSTANCE_MAPPING_CACHE_FILE, 'w', encoding="utf-8") as f:
+            json.dump(db_map, f)
+    except OSError as e:
+        LOGGER.debug(f'Failed to write the DB Instance Mapping to {RDS_INSTANCE_MAPPING_CACHE_FILE}: {e}')
 
-    mappings_section_tables = mappings_section.find_all_next("table")
-    LOGGER.debug("mappings_section_tables: {}".format(mappings_section_tables))
+    return db_map
 
-    db_map = {}
+def read_rds_instance_mapping_file(file_path):
+    """ Return the db instance mapping saved in file_path, or an empty mapping if the file is missing or unreadable """
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            db_map = json.load(f)
+        LOGGER.debug(f'Read RDS db instance mapping from file {file_path}')
+        return db_map
+    except (OSError, ValueError):
+        LOGGER.debug(f'No RDS db instance mapping found in file {file_path}')
+        return {}
 
-    for table in mappings_section_tables:
-        rows = table.find_all("tr")
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols)>1:
-                db_class = (cols[0].text.strip()).strip('*')
-                default_vcpus = cols[1].text.strip()
-                db_map[db_class] = default_vcpus
+"""
+Load the bundled db instance mapping, with the instance classes scraped by earlier runs merged over it.
+The AWS documentation is only scraped if neither file can be read.
+"""
+def load_rds_instance_mapping():
+    db_map = {**read_rds_instance_mapping_file(RDS_INSTANCE_MAPPING_FILE),
+              **read_rds_instance_mapping_file(RDS_INSTANCE_MAPPING_CACHE_FILE)}
+    if not db_map:
+        LOGGER.debug("No RDS db instance mapping file found, getting mapping from AWS documentation")
+        db_map = get_rds_instance_mapping()
+    return db_map
 
-    LOGGER.debug(f'DB Instance Mapping: {db_map}')
-    
-    LOGGER.debug(f'Saving the DB Instance Mapping to rds_instance_mapping.json')
-    with open('rds_instance_mapping.json', 'w') as f:
-        json.dump(db_map, f)
+def get_pricing_cache_path(db_engine):
+    return os.path.join(HTTP_CACHE_DIR, f'pricing-{db_engine}.json')
 
-    return db_map
+def read_cached_pricing(db_engine):
+    """
+    Return the prices of a db engine saved on disk by an earlier run, or None if there are none younger than a day
+    """
+    cache_path = get_pricing_cache_path(db_engine)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached['fetched_at'] >= HTTP_CACHE_TTL:
+        return None
+    LOGGER.debug(f'Using cached prices for {db_engine} Extended Support from {cache_path}')
+    return tuple(cached['pricing'])
+
+def write_cached_pricing(db_engine, pricing):
+    """ Save the prices of a db engine on disk, so runs on the same day skip the Pricing API """
+    cache_path = get_pricing_cache_path(db_engine)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w', encoding="utf-8") as f:
+            json.dump({'db_engine': db_engine, 'fetched_at': time.time(), 'pricing': pricing}, f)
+    except OSError as e:
+        LOGGER.debug(f'Failed to write the cached prices to {cache_path}: {e}')
+
+def get_pricing_client():
+    """
+    Pricing API client shared by every engine and pricing year, boto3 clients are thread safe.
+    The client is created once under a lock from a dedicated session, as creating clients from boto3's default session
+    is not thread safe and the engines are priced in parallel threads.
+    boto3 is only imported on a price cache miss, which keeps the module cheap to import for the eligibility checks.
+    """
+    global pricing_client
+    with pricing_client_lock:
+        if pricing_client is None:
+            import boto3
+            from botocore.config import Config
+            pricing_client = boto3.session.Session().client(
+                'pricing', region_name='us-east-1',
+                config=Config(max_pool_connections=16, retries={'max_attempts': 10, 'mode': 'adaptive'}))
+        return pricing_client
 
 def get_rds_extended_support_pricing(db_engine):
-    global aurora_provisioned_price_map
-    global aurora_serverless_v2_price_map
-    global db_engine_price_map
-
-    # if db_engine == 'aurora':
-    #     if len(aurora_provisioned_price_map) >0:
-    #         LOGGER.debug("Returning cached prices for Aurora Extended Support")
-    #         return aurora_provisioned_price_map, aurora_serverless_v2_price_map
-    #     else:
-    #         LOGGER.debug("No cached prices found for Aurora Extended Support, getting prices from AWS Pricing page")
-    # else:
-    #     if len(db_engine_price_map) > 0:
-    #         LOGGER.debug("Returning cached prices for RDS Extended Support")
-    #         return db_engine_price_map, "N/A"
-    #     else:
-    #         LOGGER.debug("No cached prices found for RDS Extended Support, getting prices from AWS Pricing page")
-    
-    if len(db_engine_price_map) > 0:
-        LOGGER.debug("Returning cached prices for RDS Extended Support")
-        return db_engine_price_map, "N/A"
-    else:
-        LOGGER.debug("No cached prices found for RDS Extended Support, getting prices from AWS Pricing page")
-
+    with price_cache_locks.setdefault(db_engine, threading.Lock()):
+        if db_engine in price_cache:
+            LOGGER.debug("Returning cached prices for %s Extended Support", db_engine)
+        else:
+            pricing = read_cached_pricing(db_engine)
+            if pricing is None:
+                LOGGER.debug(f"No cached prices found for {db_engine} Extended Support, getting prices from AWS Pricing API")
+                pricing = fetch_rds_extended_support_pricing(db_engine)
+                write_cached_pricing(db_engine, pricing)
+            price_cache[db_engine] = pricing
+        return price_cache[db_engine]
+
+def prefetch_rds_extended_support_pricing(db_engines):
+    """ Fetch the prices of the db engines that are not cached yet concurrently, instead of one engine after another """
+    db_engines = [db_engine for db_engine in set(db_engines) if db_engine not in price_cache]
+    if len(db_engines) == 0:
+        return
+    with ThreadPoolExecutor(max_workers=len(db_engines)) as executor:
+        list(executor.map(get_rds_extended_support_pricing, db_engines))
+
+def fetch_rds_extended_support_pricing(db_engine):
     api_filters = {
         'mysql': {'databaseEngine': 'MySQL', 'engineMajorVersion': '5.7'},
         'postgres': {'databaseEngine': 'PostgreSQL', 'engineMajorVersion': '11'},
@@ -199,7 +443,7 @@ def get_rds_extended_support_pricing(db_engine):
 
     def get_price_map(db_engine):
         price_map = {}
-        extended_support_pricing = boto3.client('pricing', region_name='us-east-1')
+        extended_support_pricing = get_pricing_client()
 
         engine = api_filters[db_engine]['databaseEngine']
         major_version = api_filters[db_engine]['engineMajorVersion']
@@ -208,30 +452,34 @@ def get_rds_extended_support_pricing(db_engine):
             'yr_3_price': 'Year 3'
         }
 
-        for year_code, year_string in year_options.items():
+        def get_price_list(year_string):
             f = FILTER.format(e=engine, v=major_version, y=year_string)
             LOGGER.debug(f'AWS Pricing API filter: {f} for engine {db_engine}')
 
-            response = extended_support_pricing.get_products(
-                            ServiceCode='AmazonRDS',
-                            FormatVersion='aws_v1',
-                            Filters=json.loads(f) 
-                        )
-            if 'PriceList' in response and len(response['PriceList']) > 0:
-                price_list = response['PriceList']
-            else:
+            paginator = extended_support_pricing.get_paginator('get_products')
+            price_list = [obj for page in paginator.paginate(
+                                ServiceCode='AmazonRDS',
+                                FormatVersion='aws_v1',
+                                Filters=json.loads(f)
+                            ) for obj in page.get('PriceList', [])]
+            if len(price_list) == 0:
                 LOGGER.error("Invalid Arguments for databaseEngine: {}, engineMajorVersion: {} or ExtendedSupportPricingYear: {}".format(engine, major_version, year_string))
                 raise Exception('Invalid Arguments for DB Engine, EngineVersion or ExtendedSupportPricingYear')
-        
-            LOGGER.debug(f'extended support pricing response: {price_list}')
+            return price_list
+
+        # The pricing years are independent queries, fetch them concurrently
+        with ThreadPoolExecutor(max_workers=len(year_options)) as executor:
+            price_lists = dict(zip(year_options, executor.map(get_price_list, year_options.values())))
+
+        for year_code, price_list in price_lists.items():
+            LOGGER.debug('extended support pricing response: %s', price_list)
             for obj in price_list:
-                sku = json.loads(obj)
+                sku = json_loads(obj)
                 region = sku['product']['attributes']['regionCode']
                 if region not in price_map:
                     price_map[region] = {}
                 ''' Since the pricing API returns a dict with dynamically generated keys which are not pre-known, 
-                in order to access the 'pricePerUnit' child attributes, we need to convert the dict into list to 
-                access the dict's key elements at known positions in the list.
+                in order to access the 'pricePerUnit' child attributes, we take the first key of each dict.
                 For eg, the following is the returned response from pricing API: 
                     "terms": {
                         "OnDemand": {
@@ -249,8 +497,8 @@ def get_rds_extended_support_pricing(db_engine):
                 then id1 in below code points to the dict key `YZBJ7XT2D98GGDZH.99YE2YK9UR` and id2 points to the dict key `YZBJ7XT2D98GGDZH.99YE2YK9UR.Q7UJUT2CE6`
                 '''
                 od = sku['terms']['OnDemand']
-                id1 = list(od)[0]
-                id2 = list(od[id1]['priceDimensions'])[0]
+                id1 = next(iter(od))
+                id2 = next(iter(od[id1]['priceDimensions']))
                 if 'USD' in od[id1]['priceDimensions'][id2]['pricePerUnit']:
                     extended_support_price = od[id1]['priceDimensions'][id2]['pricePerUnit']['USD']
                 else:
@@ -261,26 +509,50 @@ def get_rds_extended_support_pricing(db_engine):
         return price_map
 
     LOGGER.info(f'Extracting RDS extended support pricing for engine {db_engine} using Pricing API')
-    db_engine_price_map = get_price_map(db_engine)
-    LOGGER.debug(f'db engine price map: {db_engine_price_map}')
-    return db_engine_price_map, "N/A"
+    price_map = get_price_map(db_engine)
+    LOGGER.debug('db engine price map: %s', price_map)
+    return price_map, "N/A"
 
 
 def is_extended_support_eligible(rds_instance):
-    if rds_instance['Engine'] in ['aurora-mysql']: 
-        if ("mysql_aurora.2.11" in rds_instance['EngineVersion']) or ("mysql_aurora.2.12" in rds_instance['EngineVersion']):
-            return True
-    
-    if rds_instance['Engine'] in ['aurora-postgresql'] and rds_instance['EngineVersion'] in ["11.9", "11.21"]:
-            return True
-    
-    if rds_instance['Engine'] in ['mysql'] and "5.7" in rds_instance['EngineVersion']:
-        return True
-    
-    if rds_instance['Engine'] in ['postgres'] and "11" in rds_instance['EngineVersion']:
-        return True
-    
-    return False
+    return is_engine_version_eligible(rds_instance['Engine'], rds_instance['EngineVersion'])
+
+"""
+(engine, version key) pairs that are eligible for extended support, see get_engine_version_key for the version keys
+"""
+EXTENDED_SUPPORT_ELIGIBLE_VERSIONS = frozenset({
+    ('aurora-mysql', '2.11'),
+    ('aurora-mysql', '2.12'),
+    ('aurora-postgresql', '11.9'),
+    ('aurora-postgresql', '11.21'),
+    ('mysql', '5.7'),
+    ('postgres', '11'),
+})
+
+# Precompiled patterns capturing the version key of each engine, engines without a pattern use the exact version
+ENGINE_VERSION_KEY_PATTERNS = {
+    'aurora-mysql': re.compile(r'.*mysql_aurora\.(\d+\.\d+)'),
+    'mysql': re.compile(r'(\d+\.\d+)'),
+    'postgres': re.compile(r'(\d+)'),
+}
+
+def get_engine_version_key(engine, engine_version):
+    """
+    Normalize an engine version to the part that decides extended support eligibility:
+    Aurora MySQL major.minor version (5.7.mysql_aurora.2.11.2 -> 2.11), exact Aurora PostgreSQL version,
+    MySQL major.minor version (5.7.44 -> 5.7) and PostgreSQL major version (11.22 -> 11)
+    """
+    pattern = ENGINE_VERSION_KEY_PATTERNS.get(engine)
+    match = pattern.match(engine_version) if pattern else None
+    return match.group(1) if match else engine_version
+
+"""
+Check if an engine & engine version pair is eligible for extended support.
+A fleet only has a handful of distinct pairs, so the result is cached per pair.
+"""
+@functools.lru_cache(maxsize=1024)
+def is_engine_version_eligible(engine, engine_version):
+    return (engine, get_engine_version_key(engine, engine_version)) in EXTENDED_SUPPORT_ELIGIBLE_VERSIONS
 
 
 def main():
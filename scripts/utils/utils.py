@@ -1,7 +1,6 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
-import csv
 from utils.log import get_logger
 from utils.constants import ACCOUNT_ID_LENGTH
 from botocore.exceptions import ClientError
@@ -14,25 +13,25 @@ class ValidationException(Exception):
     """
     pass
 
+def read_first_column(file_path):
+    """
+    Read a single column file in one go and return the first column of every non empty row
+    """
+    with open(file_path, 'r', encoding="utf-8") as fp:
+        lines = fp.read().splitlines()
+    # Skip empty rows, and strip the quotes of quoted cells such as "123456789012"
+    return [line.split(',', 1)[0].strip().strip('"') for line in lines if line.replace(',', '').strip()]
+
 def read_accounts_from_file(file_path):
     """
     Read CSV file containing AWS Account IDs and return the list of accounts
     """
     try:
-        accounts = []
         LOGGER.info(f"Reading accounts from file: {file_path}")
-        with open(file_path, 'r', encoding="utf-8") as fp:
-            rows = csv.reader(fp)
-            for row in rows:
-                # Skip empty rows
-                if not ''.join(row).strip():
-                    continue
-                account_id = row[0]
-                if is_valid_account_id(account_id):
-                    accounts.append(account_id)
-                else:
-                    raise ValidationException(
-                        f"Invalid data in file {file_path}.\nThe file should contain only 12 digit AWS Account IDs")
+        accounts = read_first_column(file_path)
+        if not all(is_valid_account_id(account_id) for account_id in accounts):
+            raise ValidationException(
+                f"Invalid data in file {file_path}.\nThe file should contain only 12 digit AWS Account IDs")
         return accounts
     except Exception as err:
         LOGGER.error(f"Failed when reading accounts from file: {file_path}")
@@ -45,10 +44,8 @@ def write_accounts_to_file(accounts):
     file_path = "accounts.csv"
     try:
         LOGGER.info(f"Writing accounts to file: {file_path}")
-        with open(file_path, 'w', encoding="utf-8", newline ='') as fp:
-            writer = csv.writer(fp)
-            for account in accounts:
-                writer.writerow([account])
+        with open(file_path, 'w', encoding="utf-8") as fp:
+            fp.writelines(f'{account}\n' for account in accounts)
     except Exception as err:
         LOGGER.error(f"Failed when writing accounts to file: {file_path}")
         raise err
@@ -58,17 +55,8 @@ def read_regions_from_file(file_path):
     Read CSV file containing specific AWS Regions to use and return the list of regions
     """
     try:
-        regions = []
         LOGGER.info(f"Reading regions from file: {file_path}")
-        with open(file_path, 'r', encoding="utf-8") as fp:
-            rows = csv.reader(fp)
-            for row in rows:
-                # Skip empty rows
-                if not ''.join(row).strip():
-                    continue
-                region = row[0]
-                regions.append(region)
-        return regions
+        return read_first_column(file_path)
     except Exception as err:
         LOGGER.error(f"Failed when reading regions from file: {file_path}")
         raise err
@@ -80,10 +68,8 @@ def write_regions_to_file(regions):
     file_path = "regions.csv"
     try:
         LOGGER.info(f"Writing regions to file: {file_path}")
-        with open(file_path, 'w', encoding="utf-8", newline ='') as fp:
-            writer = csv.writer(fp)
-            for region in regions:
-                writer.writerow([region])
+        with open(file_path, 'w', encoding="utf-8") as fp:
+            fp.writelines(f'{region}\n' for region in regions)
     except Exception as err:
         LOGGER.error(f"Failed when writing regions to file: {file_path}")
         raise err
@@ -95,7 +81,8 @@ def is_china_region(boto_client):
     return boto_client.meta.partition == 'aws-cn'
 
 def is_valid_account_id(account_id):
-    return account_id.isnumeric() and len(account_id) == ACCOUNT_ID_LENGTH
+    # The O(1) length check fails fast, the account id must then be plain ASCII digits
+    return len(account_id) == ACCOUNT_ID_LENGTH and account_id.isascii() and account_id.isdigit()
 
 def _validate_account(account_id):
     if is_valid_account_id(account_id) is not True:
@@ -104,22 +91,16 @@ def _validate_account(account_id):
 
 def get_all_org_accounts(org_client_):
         """ Returns all ACTIVE accounts in the organization """
-        result = []
-        response = org_client_.list_accounts()
-        active_accounts = list(filter(lambda x: x['Status'] == 'ACTIVE', response['Accounts']))
-        result.extend(list(map(lambda x: x['Id'], active_accounts)))
-        while 'NextToken' in response and response['NextToken']:
-            response = org_client_.list_accounts(NextToken=response['NextToken'])
-            active_accounts = list(filter(lambda x: x['Status'] == 'ACTIVE', response['Accounts']))
-            result.extend(list(map(lambda x: x['Id'], active_accounts)))
-        return result
+        paginator = org_client_.get_paginator('list_accounts')
+        return [account['Id'] for page in paginator.paginate() for account in page['Accounts'] if account['Status'] == 'ACTIVE']
 
 def validate_org_accounts(input_accounts, payer_account, all_member_accounts):
-    # validate accounts passed in are member accounts in payer's org
-    for account in input_accounts:
-        if account not in all_member_accounts:
-            raise ValidationException(
-                f"Invalid input: {account} is not a member of payer ({payer_account}) org")
+    # validate accounts passed in are member accounts in payer's org, reporting every invalid account at once
+    member_accounts = set(all_member_accounts)
+    missing_accounts = [account for account in input_accounts if account not in member_accounts]
+    if missing_accounts:
+        raise ValidationException(
+            f"Invalid input: {', '.join(missing_accounts)} not members of payer ({payer_account}) org")
 
 
 def validate_if_being_run_by_payer_account(org_client, caller_account):